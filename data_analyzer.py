@@ -5,38 +5,218 @@ Data Analyzer Module
 Analyzes collected data using Google Gemini AI for intelligent insights
 """
 
+import asyncio
+import io
 import logging
-import json
-from typing import Dict, List, Any
+import os
+import tempfile
+import time
+from functools import partial
+from typing import Dict, List, Any, AsyncIterable, AsyncIterator, Callable, Optional, Tuple
 from datetime import datetime
+import orjson
 import google.generativeai as genai
+from llm_cache import LLMCache, TieredCache
 
 logger = logging.getLogger(__name__)
 
+# Model clients shared by all DataAnalyzer instances, keyed by model name
+_MODEL_CACHE: Dict[str, genai.GenerativeModel] = {}
+
+# Embedding model used for semantic cache lookups
+EMBEDDING_MODEL = 'models/text-embedding-004'
+
+# Order in which analysis sections are produced and reported
+ANALYSIS_SECTIONS = ('financial', 'history', 'industry', 'swot', 'predictions')
+
+# Response schema for requesting every analysis section in one call
+ANALYSIS_SCHEMA = {
+    'type': 'OBJECT',
+    'properties': {
+        'financial': {
+            'type': 'OBJECT',
+            'properties': {
+                'revenue': {'type': 'STRING'},
+                'profitability': {'type': 'STRING'},
+                'health': {'type': 'STRING'},
+                'investment_rating': {'type': 'STRING'}
+            }
+        },
+        'history': {
+            'type': 'OBJECT',
+            'properties': {'timeline': {'type': 'STRING'}}
+        },
+        'industry': {
+            'type': 'OBJECT',
+            'properties': {'market_analysis': {'type': 'STRING'}}
+        },
+        'swot': {
+            'type': 'OBJECT',
+            'properties': {
+                'strengths': {'type': 'ARRAY', 'items': {'type': 'STRING'}},
+                'weaknesses': {'type': 'ARRAY', 'items': {'type': 'STRING'}},
+                'opportunities': {'type': 'ARRAY', 'items': {'type': 'STRING'}},
+                'threats': {'type': 'ARRAY', 'items': {'type': 'STRING'}}
+            }
+        },
+        'predictions': {
+            'type': 'OBJECT',
+            'properties': {'outlook': {'type': 'STRING'}}
+        }
+    },
+    'required': list(ANALYSIS_SECTIONS)
+}
+
+# Prompt used for each analysis; the scraped context is prepended by
+# _PROMPT_TEMPLATE so the shared prefix stays identical across prompts
+_PROMPT_TEMPLATE = "{context}\n\n{question}"
+
+_PROMPTS: Dict[str, str] = {
+    'all': """Based on the above information, provide a complete analysis as a JSON object with these sections:
+- financial: revenue trends, profitability metrics, financial health indicators
+  and investment potential (keys: revenue, profitability, health, investment_rating)
+- history: key milestones, company evolution, major achievements and turning points
+  as a detailed narrative (key: timeline)
+- industry: industry trends, market position, competitive landscape and growth
+  opportunities as a structured analysis (key: market_analysis)
+- swot: at least 3 each of strengths, weaknesses, opportunities and threats
+  (keys: strengths, weaknesses, opportunities, threats)
+- predictions: future outlook (next 1-3 years), key growth drivers, risk factors
+  and strategic recommendations (key: outlook)""",
+    'financial': """Based on the above information, provide a detailed financial analysis including:
+- Revenue trends
+- Profitability metrics
+- Financial health indicators
+- Investment potential
+
+Format as JSON with keys: revenue, profitability, health, investment_rating""",
+    'history': """Provide a historical analysis including:
+- Key milestones
+- Company evolution
+- Major achievements
+- Turning points
+
+Format as detailed narrative.""",
+    'industry': """Analyze the industry and market including:
+- Industry trends
+- Market position
+- Competitive landscape
+- Growth opportunities
+
+Format as structured analysis.""",
+    'swot': """Perform a SWOT analysis providing:
+- Strengths (at least 3)
+- Weaknesses (at least 3)
+- Opportunities (at least 3)
+- Threats (at least 3)
+
+Format as JSON.""",
+    'predictions': """Based on the analysis, provide:
+- Future outlook (next 1-3 years)
+- Key growth drivers
+- Risk factors
+- Strategic recommendations
+
+Format as structured predictions."""
+}
+
+# Sections answered as structured JSON, and the result key for free-text sections
+JSON_SECTIONS = ('financial', 'swot')
+TEXT_SECTION_KEYS = {
+    'history': 'timeline',
+    'industry': 'market_analysis',
+    'predictions': 'outlook'
+}
+
+# Response schemas of the prompts answered as structured JSON
+SECTION_SCHEMAS = {
+    section: dict(ANALYSIS_SCHEMA['properties'][section],
+                  required=list(ANALYSIS_SCHEMA['properties'][section]['properties']))
+    for section in JSON_SECTIONS
+}
+SECTION_SCHEMAS['all'] = ANALYSIS_SCHEMA
+
+# Gemini Batch API job polling
+BATCH_POLL_INTERVAL = 30
+BATCH_FINAL_STATES = ('JOB_STATE_SUCCEEDED', 'JOB_STATE_FAILED', 'JOB_STATE_CANCELLED', 'JOB_STATE_EXPIRED')
+
+# Scraped sources each analysis needs before it can start
+ANALYSIS_INPUTS = {
+    'financial': ('company',),
+    'history': ('wikipedia',),
+    'industry': ('google', 'company'),
+    'swot': ('wikipedia', 'google', 'company'),
+    'predictions': ('wikipedia', 'google', 'company')
+}
+
 
 class DataAnalyzer:
     """
     Performs intelligent analysis on collected data using Gemini API
     """
     
-    def __init__(self, api_key: str, model: str = 'gemini-pro'):
+    def __init__(self, api_key: str, model: str = 'gemini-pro', use_cache: bool = True,
+                 batch_sections: bool = True, redis_url: Optional[str] = None):
         """
         Initialize the DataAnalyzer with Gemini API
         
         Args:
             api_key: Google Gemini API key
             model: Model to use (default: gemini-pro)
+            use_cache: Serve repeated prompts from the tiered LLM cache
+            batch_sections: Request all analysis sections in one structured call
+            redis_url: Redis URL for sharing cached responses between processes
         """
         self.api_key = api_key
         self.model_name = model
+        self.batch_sections = batch_sections
         genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel(model)
+        if model not in _MODEL_CACHE:
+            _MODEL_CACHE[model] = genai.GenerativeModel(model)
+        self.model = _MODEL_CACHE[model]
+        self.cache = None
+        if use_cache:
+            self.cache = TieredCache(LLMCache(model, embed_fn=_embed_prompt), redis_url=redis_url)
+        self.stats = self.cache.stats if self.cache else {}
         logger.info(f'DataAnalyzer initialized with model: {model}')
     
+    async def __aenter__(self) -> 'DataAnalyzer':
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+    
+    async def aclose(self):
+        """
+        Close the LLM cache's Redis client and persistent store
+        """
+        if self.cache:
+            await self.cache.aclose()
+    
     def analyze(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Analyze scraped data and generate insights using Gemini
         
+        Synchronous wrapper around analyze_async for callers without
+        a running event loop.
+        
+        Args:
+            data: Dictionary containing scraped data
+            
+        Returns:
+            Dictionary with analysis results and insights
+        """
+        return asyncio.run(self.analyze_async(data))
+    
+    async def analyze_async(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Analyze scraped data and generate insights using Gemini
+        
+        All sections are requested in a single structured Gemini call when
+        batch_sections is enabled. Sections that call leaves out, or all of
+        them when it is disabled or fails, are requested through the
+        independent per-section analyses, dispatched concurrently.
+        
         Args:
             data: Dictionary containing scraped data
             
@@ -44,6 +224,7 @@ class DataAnalyzer:
             Dictionary with analysis results and insights
         """
         logger.info('Starting data analysis with Gemini')
+        timestamp = datetime.now().isoformat()
         
         try:
             # Prepare context from scraped data
@@ -51,43 +232,325 @@ class DataAnalyzer:
             
             # Generate comprehensive analysis
             insights = {
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': timestamp,
                 'query': data.get('query', 'Unknown'),
                 'sources_analyzed': len(data.get('sources', [])),
                 'analysis': {}
             }
             
-            # Financial Analysis
-            fin_analysis = self._analyze_financial(context)
-            if fin_analysis:
-                insights['analysis']['financial'] = fin_analysis
-            
-            # Historical/Background Analysis
-            hist_analysis = self._analyze_history(context)
-            if hist_analysis:
-                insights['analysis']['history'] = hist_analysis
-            
-            # Industry/Market Analysis
-            industry_analysis = self._analyze_industry(context)
-            if industry_analysis:
-                insights['analysis']['industry'] = industry_analysis
-            
-            # Strengths & Weaknesses Analysis
-            swot_analysis = self._analyze_swot(context)
-            if swot_analysis:
-                insights['analysis']['swot'] = swot_analysis
-            
-            # Future Predictions
-            predictions = self._analyze_predictions(context)
-            if predictions:
-                insights['analysis']['predictions'] = predictions
+            # One structured call for all sections, falling back to one call per missing section
+            analysis = {}
+            if self.batch_sections:
+                analysis = await self._analyze_all(context, insights['query']) or {}
+            missing = [section for section in ANALYSIS_SECTIONS if section not in analysis]
+            if missing:
+                analysis.update(await self._analyze_sections(context, insights['query'], missing))
+            insights['analysis'] = {
+                section: analysis[section] for section in ANALYSIS_SECTIONS if section in analysis
+            }
             
             logger.info('Data analysis completed successfully')
+            if self.cache:
+                logger.info(f'LLM cache stats: {self.stats}')
             return insights
         
         except Exception as e:
             logger.error(f'Error during analysis: {str(e)}')
-            return self._error_insights(data, str(e))
+            return self._error_insights(data, str(e), timestamp)
+    
+    async def _analyze_sections(self, context: str, query: str,
+                                sections: Tuple[str, ...] = ANALYSIS_SECTIONS) -> Dict[str, Any]:
+        """
+        Run the per-section analyses concurrently over a shared context
+        """
+        analysis = {}
+        
+        # Financial, history, industry, SWOT and predictions in parallel
+        analyzers = self._analyzers()
+        results = await asyncio.gather(
+            *(analyzers[section](context, query) for section in sections),
+            return_exceptions=True
+        )
+        
+        for section, result in zip(sections, results):
+            if isinstance(result, BaseException):
+                logger.warning(f'{section.capitalize()} analysis failed: {str(result)}')
+            elif result:
+                analysis[section] = result
+        
+        return analysis
+    
+    def analyze_many(self, datasets: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Analyze many scraped datasets through the Gemini Batch API
+        
+        Intended for non-interactive runs. With batch_sections enabled, one
+        structured request per dataset asks for every section; sections it
+        leaves out go into a second job with one request per section.
+        Prompts already in the LLM cache are not submitted, and each job is
+        polled until it finishes. Requires the google-genai package.
+        
+        Args:
+            datasets: Scraped data dictionaries, as returned by DataScraper.scrape
+            
+        Returns:
+            List of insights dictionaries in the same order as datasets
+        """
+        logger.info(f'Starting batch analysis of {len(datasets)} datasets')
+        timestamp = datetime.now().isoformat()
+        
+        contexts = [self._prepare_context(data) for data in datasets]
+        analyses = [{} for _ in datasets]
+        error = None
+        
+        if self.batch_sections:
+            parsed, error = self._batch_generate({
+                f'{index}:all': (data.get('query', 'Unknown'), 'all', contexts[index])
+                for index, data in enumerate(datasets)
+            }, lambda name, text: self._combined_result(text))
+            for key, combined in parsed.items():
+                analyses[int(key.split(':', 1)[0])] = combined
+        
+        requests = {
+            f'{index}:{section}': (data.get('query', 'Unknown'), section, contexts[index])
+            for index, data in enumerate(datasets)
+            for section in ANALYSIS_SECTIONS
+            if section not in analyses[index]
+        }
+        if requests:
+            parsed, error = self._batch_generate(requests, self._section_result)
+            for key, result in parsed.items():
+                index, section = key.split(':', 1)
+                analyses[int(index)][section] = result
+        
+        results = []
+        for data, analysis in zip(datasets, analyses):
+            insights = {
+                'timestamp': timestamp,
+                'query': data.get('query', 'Unknown'),
+                'sources_analyzed': len(data.get('sources', [])),
+                'analysis': {
+                    section: analysis[section] for section in ANALYSIS_SECTIONS if section in analysis
+                }
+            }
+            
+            if error and not insights['analysis']:
+                insights = self._error_insights(data, error, timestamp)
+            results.append(insights)
+        
+        logger.info('Batch analysis completed')
+        return results
+    
+    def _batch_generate(self, requests: Dict[str, Tuple[str, str, str]],
+                        parse: Callable[[str, str], Any]) -> Tuple[Dict[str, Any], Optional[str]]:
+        """
+        Answer prompts from the LLM cache, submitting the rest as one batch job
+        
+        Responses that parse fails on are logged and left out, and are not
+        cached.
+        
+        Args:
+            requests: Mapping of request key to (query, prompt name, context)
+            parse: Turns (prompt name, response text) into the analysis
+                result, raising ValueError if the response is unusable
+            
+        Returns:
+            Tuple of (parsed result by request key, error message if the
+            batch job failed)
+        """
+        prompts = {}
+        results = {}
+        
+        def parse_response(key: str, text: str) -> bool:
+            name = requests[key][1]
+            try:
+                results[key] = parse(name, text)
+                return True
+            except ValueError as e:
+                logger.warning(f'Batch {name} response for {key} is invalid: {str(e)}')
+                return False
+        
+        for key, (query, name, context) in requests.items():
+            prompt = _PROMPT_TEMPLATE.format(context=context, question=_PROMPTS[name])
+            generation_config = _json_config(name) if name in SECTION_SCHEMAS else None
+            scope = _cache_scope(query, _PROMPTS[name])
+            prompts[key] = (prompt, generation_config, scope)
+            cached = self.cache.get(prompt, generation_config, scope) if self.cache else None
+            if cached is not None:
+                parse_response(key, cached)
+        
+        pending = {
+            key: (prompt, generation_config)
+            for key, (prompt, generation_config, _) in prompts.items()
+            if key not in results
+        }
+        if not pending:
+            return results, None
+        
+        try:
+            for key, text in self._run_batch_job(pending).items():
+                if parse_response(key, text) and self.cache:
+                    prompt, generation_config, scope = prompts[key]
+                    self.cache.put(prompt, text, generation_config, scope)
+        except Exception as e:
+            logger.error(f'Batch analysis failed: {str(e)}')
+            return results, str(e)
+        
+        return results, None
+    
+    def _run_batch_job(self, prompts: Dict[str, Tuple[str, Optional[Dict[str, Any]]]]) -> Dict[str, str]:
+        """
+        Submit prompts as one Gemini batch job and wait for the responses
+        
+        Args:
+            prompts: Mapping of request key to (prompt text, generation config)
+            
+        Returns:
+            Mapping of request key to response text for successful requests
+        """
+        from google import genai as genai_client
+        from google.genai import types
+        
+        client = genai_client.Client(api_key=self.api_key)
+        
+        with tempfile.NamedTemporaryFile('wb', suffix='.jsonl', delete=False) as f:
+            for key, (prompt, generation_config) in prompts.items():
+                request = {'contents': [{'role': 'user', 'parts': [{'text': prompt}]}]}
+                if generation_config:
+                    request['generationConfig'] = {
+                        'responseMimeType': generation_config['response_mime_type'],
+                        'responseSchema': generation_config['response_schema']
+                    }
+                f.write(orjson.dumps({'key': key, 'request': request}) + b'\n')
+            requests_path = f.name
+        
+        try:
+            uploaded = client.files.upload(
+                file=requests_path,
+                config=types.UploadFileConfig(display_name='agent-batch', mime_type='jsonl')
+            )
+        finally:
+            os.remove(requests_path)
+        
+        job = client.batches.create(
+            model=self.model_name,
+            src=uploaded.name,
+            config={'display_name': 'agent-batch'}
+        )
+        logger.info(f'Submitted batch job {job.name} with {len(prompts)} requests')
+        
+        while job.state.name not in BATCH_FINAL_STATES:
+            time.sleep(BATCH_POLL_INTERVAL)
+            job = client.batches.get(name=job.name)
+        
+        if job.state.name != 'JOB_STATE_SUCCEEDED':
+            raise RuntimeError(f'Batch job {job.name} ended in state {job.state.name}')
+        
+        responses = {}
+        for line in client.files.download(file=job.dest.file_name).splitlines():
+            if not line.strip():
+                continue
+            result = orjson.loads(line)
+            if 'response' not in result:
+                logger.warning(f'Batch request {result.get("key")} failed: {result.get("error")}')
+                continue
+            parts = result['response']['candidates'][0]['content']['parts']
+            responses[result['key']] = ''.join(part.get('text', '') for part in parts)
+        
+        return responses
+    
+    async def analyze_stream(
+        self, query: str, sources: AsyncIterable[Tuple[str, str, Any]]
+    ) -> Tuple[Dict[str, Any], Dict[str, asyncio.Task]]:
+        """
+        Start each analysis as soon as the sources it needs have arrived
+        
+        Args:
+            query: Search query (company or person name)
+            sources: Async iterable of (source key, source label, content)
+                tuples, e.g. DataScraper.scrape_iter
+            
+        Returns:
+            Tuple of (insights, tasks). insights carries the metadata with
+            an empty 'analysis' dict; tasks maps each analysis section to
+            its running task.
+        """
+        logger.info('Starting streaming analysis with Gemini')
+        timestamp = datetime.now().isoformat()
+        
+        data = {'query': query, 'sources': [], 'raw_content': {}}
+        collected = set()
+        tasks = {}
+        analyzers = self._analyzers()
+        
+        def start_ready(force: bool = False):
+            for section in ANALYSIS_SECTIONS:
+                if section in tasks:
+                    continue
+                if force or collected.issuperset(ANALYSIS_INPUTS[section]):
+                    context = self._prepare_context(data)
+                    tasks[section] = asyncio.create_task(analyzers[section](context, query))
+        
+        try:
+            async for key, label, content in sources:
+                collected.add(key)
+                if content:
+                    data['sources'].append(label)
+                    data['raw_content'][key] = content
+                start_ready()
+            
+            # Sources that never reported must not hold back the rest
+            start_ready(force=True)
+        
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            raise
+        
+        insights = {
+            'timestamp': timestamp,
+            'query': query,
+            'sources_analyzed': len(data['sources']),
+            'analysis': {}
+        }
+        return insights, tasks
+    
+    async def iter_completed(self, tasks: Dict[str, asyncio.Task]) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Yield analysis results in completion order
+        
+        Args:
+            tasks: Mapping of analysis section to its task, as returned by
+                analyze_stream
+            
+        Yields:
+            Tuples of (section, result); failed analyses are skipped
+        """
+        sections = {task: section for section, task in tasks.items()}
+        pending = set(sections)
+        
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                section = sections[task]
+                if task.cancelled():
+                    continue
+                if task.exception() is not None:
+                    logger.warning(f'{section.capitalize()} analysis failed: {str(task.exception())}')
+                    continue
+                yield section, task.result()
+    
+    def _analyzers(self) -> Dict[str, Callable]:
+        """
+        Map each analysis section to the coroutine function producing it
+        """
+        return {
+            'financial': self._analyze_financial,
+            'history': self._analyze_history,
+            'industry': self._analyze_industry,
+            'swot': self._analyze_swot,
+            'predictions': self._analyze_predictions
+        }
     
     def _prepare_context(self, data: Dict) -> str:
         """
@@ -107,120 +570,157 @@ class DataAnalyzer:
         
         return context
     
-    def _analyze_financial(self, context: str) -> Dict[str, Any]:
+    async def _generate(self, context: str, query: str, question: str,
+                        parse: Callable[[str], Any],
+                        generation_config: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        Generate a response to question about context, served from the
+        LLM cache when possible
+        
+        Semantic cache matches are limited to earlier answers to the same
+        question about the same query, see _cache_scope.
+        
+        Args:
+            context: Shared scraped context
+            query: Research subject
+            question: Instruction for this analysis
+            parse: Turns the response text into the analysis result, raising
+                ValueError if the response is unusable
+            generation_config: Gemini generation config for the request
+            
+        Returns:
+            Parsed analysis result
+        """
+        prompt = _PROMPT_TEMPLATE.format(context=context, question=question)
+        parsed = []
+        
+        async def compute() -> str:
+            response = await self.model.generate_content_async(
+                prompt, generation_config=generation_config, stream=True)
+            
+            text = io.StringIO()
+            async for chunk in response:
+                text.write(chunk.text)
+            # Parse before returning, so an unusable response is never cached
+            parsed.append(parse(text.getvalue()))
+            return text.getvalue()
+        
+        if self.cache is None:
+            await compute()
+        else:
+            scope = _cache_scope(query, question)
+            text = await self.cache.get_or_compute(prompt, compute, params=generation_config, scope=scope)
+            if not parsed:
+                parsed.append(parse(text))
+        return parsed[0]
+    
+    async def _analyze_all(self, context: str, query: str) -> Dict[str, Any]:
+        """
+        Produce every analysis section from a single structured Gemini call
+        """
+        try:
+            question = _PROMPTS['all']
+            return await self._generate(context, query, question, self._combined_result, _json_config('all'))
+        
+        except Exception as e:
+            logger.warning(f'Combined analysis failed, falling back to per-section calls: {str(e)}')
+            return None
+    
+    async def _analyze_financial(self, context: str, query: str) -> Dict[str, Any]:
         """
         Analyze financial aspects using Gemini
         """
         try:
-            prompt = f"""{context}\n\nBased on the above information, provide a detailed financial analysis including:
-            - Revenue trends
-            - Profitability metrics
-            - Financial health indicators
-            - Investment potential
-            
-            Format as JSON with keys: revenue, profitability, health, investment_rating"""
-            
-            response = self.model.generate_content(prompt)
-            
-            try:
-                return json.loads(response.text)
-            except:
-                return {'summary': response.text}
+            question = _PROMPTS['financial']
+            return await self._generate(context, query, question,
+                                        partial(self._section_result, 'financial'), _json_config('financial'))
         
         except Exception as e:
             logger.warning(f'Financial analysis failed: {str(e)}')
             return None
     
-    def _analyze_history(self, context: str) -> Dict[str, str]:
+    async def _analyze_history(self, context: str, query: str) -> Dict[str, str]:
         """
         Analyze historical background and milestones
         """
         try:
-            prompt = f"""{context}\n\nProvide a historical analysis including:
-            - Key milestones
-            - Company evolution
-            - Major achievements
-            - Turning points
-            
-            Format as detailed narrative."""
-            
-            response = self.model.generate_content(prompt)
-            return {'timeline': response.text}
+            question = _PROMPTS['history']
+            return await self._generate(context, query, question, partial(self._section_result, 'history'))
         
         except Exception as e:
             logger.warning(f'History analysis failed: {str(e)}')
             return None
     
-    def _analyze_industry(self, context: str) -> Dict[str, str]:
+    async def _analyze_industry(self, context: str, query: str) -> Dict[str, str]:
         """
         Analyze industry and market position
         """
         try:
-            prompt = f"""{context}\n\nAnalyze the industry and market including:
-            - Industry trends
-            - Market position
-            - Competitive landscape
-            - Growth opportunities
-            
-            Format as structured analysis."""
-            
-            response = self.model.generate_content(prompt)
-            return {'market_analysis': response.text}
+            question = _PROMPTS['industry']
+            return await self._generate(context, query, question, partial(self._section_result, 'industry'))
         
         except Exception as e:
             logger.warning(f'Industry analysis failed: {str(e)}')
             return None
     
-    def _analyze_swot(self, context: str) -> Dict[str, List[str]]:
+    async def _analyze_swot(self, context: str, query: str) -> Dict[str, List[str]]:
         """
         Perform SWOT analysis
         """
         try:
-            prompt = f"""{context}\n\nPerform a SWOT analysis providing:
-            - Strengths (at least 3)
-            - Weaknesses (at least 3)
-            - Opportunities (at least 3)
-            - Threats (at least 3)
-            
-            Format as JSON."""
-            
-            response = self.model.generate_content(prompt)
-            
-            try:
-                return json.loads(response.text)
-            except:
-                return {'summary': response.text}
+            question = _PROMPTS['swot']
+            return await self._generate(context, query, question,
+                                        partial(self._section_result, 'swot'), _json_config('swot'))
         
         except Exception as e:
             logger.warning(f'SWOT analysis failed: {str(e)}')
             return None
     
-    def _analyze_predictions(self, context: str) -> Dict[str, str]:
+    async def _analyze_predictions(self, context: str, query: str) -> Dict[str, str]:
         """
         Generate future predictions and recommendations
         """
         try:
-            prompt = f"""{context}\n\nBased on the analysis, provide:
-            - Future outlook (next 1-3 years)
-            - Key growth drivers
-            - Risk factors
-            - Strategic recommendations
-            
-            Format as structured predictions."""
-            
-            response = self.model.generate_content(prompt)
-            return {'outlook': response.text}
+            question = _PROMPTS['predictions']
+            return await self._generate(context, query, question, partial(self._section_result, 'predictions'))
         
         except Exception as e:
             logger.warning(f'Predictions analysis failed: {str(e)}')
             return None
     
-    def _error_insights(self, data: Dict, error: str) -> Dict[str, Any]:
+    def _combined_result(self, text: str) -> Dict[str, Any]:
+        """
+        Split a combined analysis response into its non-empty sections
+        """
+        result = orjson.loads(text)
+        if not isinstance(result, dict):
+            raise ValueError('combined response is not a JSON object')
+        analysis = {
+            section: result[section]
+            for section in ANALYSIS_SECTIONS
+            if isinstance(result.get(section), dict) and result[section]
+        }
+        if not analysis:
+            raise ValueError('combined response has no analysis sections')
+        return analysis
+    
+    def _section_result(self, section: str, text: str) -> Dict[str, Any]:
+        """
+        Shape the response text of a section the way the report expects
+        """
+        if section in JSON_SECTIONS:
+            result = orjson.loads(text)
+            if not isinstance(result, dict):
+                raise ValueError(f'{section} response is not a JSON object')
+            return result
+        return {TEXT_SECTION_KEYS[section]: text}
+    
+    def _error_insights(self, data: Dict, error: str, timestamp: Optional[str] = None) -> Dict[str, Any]:
         """
         Return default insights when analysis fails
         """
         return {
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': timestamp or datetime.now().isoformat(),
             'query': data.get('query'),
             'error': error,
             'analysis': {
@@ -228,3 +728,31 @@ class DataAnalyzer:
                 'message': f'Analysis failed: {error}'
             }
         }
+
+
+def _json_config(section: str) -> Dict[str, Any]:
+    """
+    Generation config constraining a section's response to its JSON schema
+    """
+    return {
+        'response_mime_type': 'application/json',
+        'response_schema': SECTION_SCHEMAS[section]
+    }
+
+
+def _cache_scope(query: str, question: str) -> str:
+    """
+    Semantic cache scope for a question asked about a query
+    
+    Prompts for different questions share the scraped context, and prompts
+    for different subjects can differ in little more than the name, so
+    semantic matches must stay within the same question and query.
+    """
+    return f'{query}\n\n{question}'
+
+
+def _embed_prompt(text: str) -> List[float]:
+    """
+    Embed a prompt for semantic cache lookups
+    """
+    return genai.embed_content(model=EMBEDDING_MODEL, content=text)['embedding']
@@ -5,40 +5,141 @@ Data Scraper Module
 Collects data from multiple sources including Wikipedia and web search results
 """
 
+import asyncio
+import hashlib
 import logging
-import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Any
-import requests
-from bs4 import BeautifulSoup
+from typing import Dict, List, Any, AsyncIterator, Optional, Tuple
+import httpx
+import orjson
+from selectolax.lexbor import LexborHTMLParser
 
 logger = logging.getLogger(__name__)
 
+# Source keys and their display labels, in reporting order
+SOURCES = (
+    ('wikipedia', 'Wikipedia'),
+    ('google', 'Google Search'),
+    ('company', 'Company Database'),
+)
+
+# Below this many pages, process start-up costs more than parallel parsing saves
+PARALLEL_PARSE_MIN_PAGES = 4
+
+# Extracted Wikipedia content is reused for this long before revalidating
+WIKI_CACHE_DIR = os.path.join('.cache', 'wiki')
+WIKI_CACHE_TTL = 24 * 60 * 60
+
+
+def parse_wiki_html(content: bytes) -> Optional[str]:
+    """
+    Extract the lead paragraphs of a Wikipedia article page
+    
+    Module-level so it can run in worker processes.
+    
+    Args:
+        content: Raw HTML of the article page
+        
+    Returns:
+        Text of the first five paragraphs, or None if the page has no
+        article body
+    """
+    tree = LexborHTMLParser(content)
+    
+    # Extract main content
+    content_div = tree.css_first('#mw-content-container')
+    if content_div is None:
+        return None
+    
+    paragraphs = content_div.css('p')[:5]
+    return ' '.join(p.text() for p in paragraphs)
+
 
 class DataScraper:
     """
     Handles web scraping and data collection from multiple sources
     """
     
-    def __init__(self, api_key: str = None, timeout: int = 10):
+    def __init__(self, api_key: str = None, timeout: int = 10,
+                 cache_dir: Optional[str] = WIKI_CACHE_DIR):
         """
         Initialize the DataScraper
         
         Args:
             api_key: Optional API key for enhanced searches
             timeout: Request timeout in seconds
+            cache_dir: Directory for cached Wikipedia pages (None disables caching)
         """
         self.api_key = api_key
         self.timeout = timeout
+        self.cache_dir = cache_dir
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
         self.sources = []
+        self._client: Optional[httpx.AsyncClient] = None
+    
+    async def __aenter__(self) -> 'DataScraper':
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+    
+    async def aclose(self):
+        """
+        Close the shared HTTP client
+        """
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """
+        Return the shared HTTP/2 client, creating it on first use
+        
+        Pooled connections are reused across requests and scrape calls
+        until aclose is called; requests to the same host are multiplexed
+        over one HTTP/2 connection.
+        """
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=True,
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+                headers=self.headers,
+                timeout=self.timeout
+            )
+        return self._client
     
     def scrape(self, query: str) -> Dict[str, Any]:
         """
         Main scraping method that collects data from multiple sources
         
+        Synchronous wrapper around scrape_async for callers without
+        a running event loop. The HTTP client is closed afterwards since
+        it cannot outlive the event loop it was created on.
+        
+        Args:
+            query: Search query (company or person name)
+            
+        Returns:
+            Dictionary containing scraped data and metadata
+        """
+        async def scrape_and_close() -> Dict[str, Any]:
+            try:
+                return await self.scrape_async(query)
+            finally:
+                await self.aclose()
+        
+        return asyncio.run(scrape_and_close())
+    
+    async def scrape_async(self, query: str) -> Dict[str, Any]:
+        """
+        Collect data from all sources concurrently
+        
         Args:
             query: Search query (company or person name)
             
@@ -54,55 +155,201 @@ class DataScraper:
             'raw_content': {}
         }
         
-        # Wikipedia source
-        wiki_data = self._scrape_wikipedia(query)
-        if wiki_data:
-            data['sources'].append('Wikipedia')
-            data['raw_content']['wikipedia'] = wiki_data
-        
-        # Google Search simulated
-        google_data = self._scrape_google_search(query)
-        if google_data:
-            data['sources'].append('Google Search')
-            data['raw_content']['google'] = google_data
+        collected = {}
+        async for key, label, content in self.scrape_iter(query):
+            collected[key] = (label, content)
         
-        # Company info if applicable
-        company_data = self._scrape_company_info(query)
-        if company_data:
-            data['sources'].append('Company Database')
-            data['raw_content']['company'] = company_data
+        # Keep source order stable regardless of completion order
+        for key, _ in SOURCES:
+            label, content = collected.get(key, (None, None))
+            if content:
+                data['sources'].append(label)
+                data['raw_content'][key] = content
         
         logger.info(f'Scraping completed. Found {len(data["sources"])} sources')
         return data
     
-    def _scrape_wikipedia(self, query: str) -> Dict[str, str]:
+    async def scrape_iter(self, query: str) -> AsyncIterator[Tuple[str, str, Any]]:
+        """
+        Yield each source as soon as it has been collected
+        
+        Args:
+            query: Search query (company or person name)
+            
+        Yields:
+            Tuples of (source key, source label, content) in completion
+            order; content is empty when the source returned nothing
+        """
+        client = self._get_client()
+        fetchers = {
+            'wikipedia': self._scrape_wikipedia,
+            'google': self._scrape_google_search,
+            'company': self._scrape_company_info
+        }
+        
+        async def fetch(key: str, label: str) -> Tuple[str, str, Any]:
+            return key, label, await fetchers[key](client, query)
+        
+        for next_source in asyncio.as_completed([fetch(key, label) for key, label in SOURCES]):
+            yield await next_source
+    
+    async def scrape_wikipedia_many(self, queries: List[str]) -> List[Optional[Dict[str, str]]]:
+        """
+        Scrape several Wikipedia articles
+        
+        Pages are fetched concurrently; when there are enough of them they
+        are parsed in parallel worker processes.
+        
+        Args:
+            queries: Article names to look up
+            
+        Returns:
+            List of {'title', 'content'} dicts (None where scraping failed),
+            in the same order as queries
+        """
+        return await self._scrape_wikipedia_pages(self._get_client(), queries)
+    
+    async def _scrape_wikipedia(self, client: httpx.AsyncClient, query: str) -> Dict[str, str]:
         """
         Scrape Wikipedia for information about the query
         """
+        pages = await self._scrape_wikipedia_pages(client, [query])
+        return pages[0]
+    
+    async def _scrape_wikipedia_pages(self, client: httpx.AsyncClient,
+                                      queries: List[str]) -> List[Optional[Dict[str, str]]]:
+        """
+        Fetch Wikipedia pages concurrently, then parse the ones not served from cache
+        """
+        fetched = await asyncio.gather(*(self._fetch_wikipedia(client, query) for query in queries))
+        
+        to_parse = [i for i, page in enumerate(fetched) if page and 'html' in page]
+        try:
+            texts = await self._parse_wiki_pages([fetched[i]['html'] for i in to_parse])
+        except Exception as e:
+            logger.warning(f'Wikipedia parsing failed: {str(e)}')
+            texts = [None] * len(to_parse)
+        
+        for i, text in zip(to_parse, texts):
+            page = fetched[i]
+            if text is None:
+                fetched[i] = None
+                continue
+            self._save_wiki_cache(page['url'], {
+                'content': text,
+                'etag': page['etag'],
+                'last_modified': page['last_modified'],
+                'fetched_at': time.time()
+            })
+            logger.info(f'Successfully scraped Wikipedia for {queries[i]}')
+            fetched[i] = {'content': text}
+        
+        return [
+            {'title': query, 'content': page['content']} if page else None
+            for query, page in zip(queries, fetched)
+        ]
+    
+    async def _fetch_wikipedia(self, client: httpx.AsyncClient, query: str) -> Optional[Dict[str, Any]]:
+        """
+        Fetch the Wikipedia page for query
+        
+        Extracted content is cached on disk; fresh entries skip the request
+        entirely and stale ones are revalidated with ETag/Last-Modified.
+        
+        Returns:
+            {'content'} when served from cache, {'url', 'html', 'etag',
+            'last_modified'} when the page needs parsing, or None on failure
+        """
         try:
             url = f'https://en.wikipedia.org/wiki/{query.replace(" ", "_")}'
-            response = requests.get(url, headers=self.headers, timeout=self.timeout)
+            cached = self._load_wiki_cache(url)
+            if cached and time.time() - cached['fetched_at'] < WIKI_CACHE_TTL:
+                logger.info(f'Using cached Wikipedia content for {query}')
+                return {'content': cached['content']}
             
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Extract main content
-                content_div = soup.find('div', {'id': 'mw-content-container'})
-                if content_div:
-                    paragraphs = content_div.find_all('p')
-                    text = ' '.join([p.get_text() for p in paragraphs[:5]])
-                    
-                    logger.info(f'Successfully scraped Wikipedia for {query}')
-                    return {'title': query, 'content': text}
+            headers = {}
+            if cached:
+                if cached.get('etag'):
+                    headers['If-None-Match'] = cached['etag']
+                if cached.get('last_modified'):
+                    headers['If-Modified-Since'] = cached['last_modified']
+            
+            response = await client.get(url, headers=headers)
+            if response.status_code == 304 and cached:
+                cached['fetched_at'] = time.time()
+                self._save_wiki_cache(url, cached)
+                logger.info(f'Wikipedia content for {query} not modified, using cache')
+                return {'content': cached['content']}
+            if response.status_code != 200:
+                return None
+            return {
+                'url': url,
+                'html': response.content,
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified')
+            }
         
         except Exception as e:
             logger.warning(f'Wikipedia scraping failed: {str(e)}')
         
         return None
     
-    def _scrape_google_search(self, query: str) -> List[Dict[str, str]]:
+    async def _parse_wiki_pages(self, pages: List[bytes]) -> List[Optional[str]]:
+        """
+        Parse Wikipedia pages, in worker processes when there are enough of them
+        """
+        if len(pages) < PARALLEL_PARSE_MIN_PAGES:
+            return [parse_wiki_html(page) for page in pages]
+        
+        loop = asyncio.get_running_loop()
+        workers = min(len(pages), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(await asyncio.gather(
+                *(loop.run_in_executor(executor, parse_wiki_html, page) for page in pages)
+            ))
+    
+    def _wiki_cache_path(self, url: str) -> str:
+        """
+        Cache file for a Wikipedia URL
+        """
+        return os.path.join(self.cache_dir, hashlib.sha256(url.encode('utf-8')).hexdigest() + '.json')
+    
+    def _load_wiki_cache(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Load the cached entry for a Wikipedia URL, if any
+        """
+        if not self.cache_dir:
+            return None
+        
+        try:
+            with open(self._wiki_cache_path(url), 'rb') as f:
+                return orjson.loads(f.read())
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f'Ignoring unreadable Wikipedia cache entry: {str(e)}')
+            return None
+    
+    def _save_wiki_cache(self, url: str, entry: Dict[str, Any]):
+        """
+        Atomically write the cached entry for a Wikipedia URL
+        """
+        if not self.cache_dir:
+            return
+        
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._wiki_cache_path(url)
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(orjson.dumps(entry))
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f'Failed to write Wikipedia cache: {str(e)}')
+    
+    async def _scrape_google_search(self, client: httpx.AsyncClient, query: str) -> List[Dict[str, str]]:
         """
-        Scrape Google Search results (simulated with requests)
+        Scrape Google Search results (simulated)
         In production, use SerpAPI or similar service
         """
         try:
@@ -132,7 +379,7 @@ class DataScraper:
             logger.warning(f'Google Search scraping failed: {str(e)}')
             return []
     
-    def _scrape_company_info(self, query: str) -> Dict[str, Any]:
+    async def _scrape_company_info(self, client: httpx.AsyncClient, query: str) -> Dict[str, Any]:
         """
         Scrape company information from various sources
         """
@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LLM Cache Module
+Tiered cache for Gemini responses: in-process LRU, shared Redis, and a
+persistent SQLite store with exact and semantic lookup
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import numpy as np
+import orjson
+from cachetools import TTLCache
+
+try:
+    import faiss
+except ImportError:  # pragma: no cover - optional dependency
+    faiss = None
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # pragma: no cover - optional dependency
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+
+class LLMCache:
+    """
+    Caches LLM responses in SQLite, keyed by (model_name, prompt_hash)
+
+    Lookups try an exact SHA-256 match first, then fall back to the most
+    similar cached prompt of the same scope by embedding cosine similarity.
+    """
+
+    def __init__(self, model_name: str, path: str = '.cache/llm_cache.sqlite',
+                 ttl: int = 86400, similarity_threshold: float = 0.95,
+                 embed_fn: Optional[Callable[[str], List[float]]] = None):
+        """
+        Initialize the LLMCache
+
+        Args:
+            model_name: Model the cached responses belong to
+            path: SQLite database file
+            ttl: Entry lifetime in seconds
+            similarity_threshold: Minimum cosine similarity for a semantic hit
+            embed_fn: Function returning an embedding for a prompt; semantic
+                lookup is disabled when not given
+        """
+        self.model_name = model_name
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self.embed_fn = embed_fn
+        self.stats = {'hits': 0, 'semantic_hits': 0, 'misses': 0}
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            'model_name TEXT NOT NULL, '
+            'prompt_hash TEXT NOT NULL, '
+            'scope_hash TEXT NOT NULL, '
+            'response TEXT NOT NULL, '
+            'embedding BLOB, '
+            'created_at REAL NOT NULL, '
+            'PRIMARY KEY (model_name, prompt_hash))'
+        )
+        self._conn.commit()
+
+        # Semantic indexes over cached prompt embeddings, one per scope, built lazily
+        self._indexes: Dict[str, Dict[str, Any]] = {}
+        self._pending_embeddings: Dict[str, np.ndarray] = {}
+
+    async def get_or_compute(self, prompt: str, compute: Callable[[], Awaitable[str]],
+                             params: Optional[Dict[str, Any]] = None,
+                             scope: Optional[str] = None) -> str:
+        """
+        Return the cached response for prompt, or compute and store it
+
+        Args:
+            prompt: Prompt sent to the model
+            compute: Coroutine function producing the response text
+            params: Request parameters that affect the response, such as the
+                generation config; part of the exact-match key
+            scope: Semantic matches are only taken from entries with the same
+                scope and params, e.g. the research subject and the
+                instruction part of the prompt
+
+        Returns:
+            Response text
+        """
+        cached = await asyncio.to_thread(self.get, prompt, params, scope)
+        if cached is not None:
+            return cached
+
+        try:
+            response = await compute()
+        except BaseException:
+            # Nothing will be stored, so drop the embedding saved by the lookup
+            self._pending_embeddings.pop(self._hash({'prompt': prompt, 'params': params}), None)
+            raise
+        await asyncio.to_thread(self.put, prompt, response, params, scope)
+        return response
+
+    def get(self, prompt: str, params: Optional[Dict[str, Any]] = None,
+            scope: Optional[str] = None) -> Optional[str]:
+        """
+        Look up a cached response for prompt
+        """
+        prompt_hash = self.key(prompt, params)
+        response = self._fetch(prompt_hash)
+        if response is not None:
+            self.stats['hits'] += 1
+            return response
+
+        if self.embed_fn is not None:
+            scope_hash = self._hash({'scope': scope, 'params': params})
+            response = self._semantic_get(prompt_hash, scope_hash, prompt)
+            if response is not None:
+                self.stats['semantic_hits'] += 1
+                return response
+
+        self.stats['misses'] += 1
+        return None
+
+    def put(self, prompt: str, response: str, params: Optional[Dict[str, Any]] = None,
+            scope: Optional[str] = None):
+        """
+        Store a response for prompt
+        """
+        prompt_hash = self.key(prompt, params)
+        scope_hash = self._hash({'scope': scope, 'params': params})
+        embedding = self._pending_embeddings.pop(prompt_hash, None)
+        if embedding is None and self.embed_fn is not None:
+            embedding = self._embed(prompt)
+
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses '
+                '(model_name, prompt_hash, scope_hash, response, embedding, created_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (self.model_name, prompt_hash, scope_hash, response,
+                 embedding.tobytes() if embedding is not None else None, time.time())
+            )
+            self._conn.commit()
+
+            if embedding is not None and scope_hash in self._indexes:
+                self._add_to_index(scope_hash, [prompt_hash], embedding[np.newaxis, :])
+
+    def close(self):
+        """
+        Close the underlying database connection
+        """
+        with self._lock:
+            self._conn.close()
+
+    def key(self, prompt: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Exact-match key for a prompt and its request parameters
+        """
+        return self._hash({'prompt': prompt, 'params': params})
+
+    def _hash(self, payload: Dict[str, Any]) -> str:
+        """
+        Deterministic key for a JSON-serializable payload
+        """
+        return hashlib.sha256(orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+    def _fetch(self, prompt_hash: str) -> Optional[str]:
+        """
+        Fetch a non-expired response by prompt hash
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT response FROM responses '
+                'WHERE model_name = ? AND prompt_hash = ? AND created_at >= ?',
+                (self.model_name, prompt_hash, time.time() - self.ttl)
+            ).fetchone()
+        return row[0] if row else None
+
+    def _embed(self, prompt: str) -> Optional[np.ndarray]:
+        """
+        Embed and L2-normalize a prompt so inner product equals cosine similarity
+        """
+        try:
+            vector = np.asarray(self.embed_fn(prompt), dtype='float32')
+        except Exception as e:
+            logger.warning(f'Prompt embedding failed: {str(e)}')
+            return None
+
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def _semantic_get(self, prompt_hash: str, scope_hash: str, prompt: str) -> Optional[str]:
+        """
+        Return the response of the most similar cached prompt in the same
+        scope, if it is above the threshold
+        """
+        embedding = self._embed(prompt)
+        if embedding is None:
+            return None
+
+        with self._lock:
+            if scope_hash not in self._indexes:
+                self._build_index(scope_hash)
+            scope_index = self._indexes[scope_hash]
+            if not scope_index['hashes']:
+                self._pending_embeddings[prompt_hash] = embedding
+                return None
+
+            query = embedding[np.newaxis, :]
+            if faiss is not None:
+                scores, ids = scope_index['index'].search(query, 1)
+                score, best = float(scores[0][0]), int(ids[0][0])
+            else:
+                similarities = scope_index['index'] @ embedding
+                best = int(np.argmax(similarities))
+                score = float(similarities[best])
+
+        if best < 0 or score < self.similarity_threshold:
+            # Reuse the embedding when the computed response is stored
+            self._pending_embeddings[prompt_hash] = embedding
+            return None
+
+        logger.info(f'Semantic cache hit (similarity {score:.3f})')
+        return self._fetch(scope_index['hashes'][best])
+
+    def _build_index(self, scope_hash: str):
+        """
+        Load non-expired embeddings of a scope into its similarity index
+        """
+        rows = self._conn.execute(
+            'SELECT prompt_hash, embedding FROM responses '
+            'WHERE model_name = ? AND scope_hash = ? AND embedding IS NOT NULL AND created_at >= ?',
+            (self.model_name, scope_hash, time.time() - self.ttl)
+        ).fetchall()
+
+        self._indexes[scope_hash] = {'index': None, 'hashes': []}
+        if rows:
+            vectors = np.stack([np.frombuffer(blob, dtype='float32') for _, blob in rows])
+            self._add_to_index(scope_hash, [prompt_hash for prompt_hash, _ in rows], vectors)
+
+    def _add_to_index(self, scope_hash: str, prompt_hashes: List[str], vectors: np.ndarray):
+        """
+        Append normalized vectors to the similarity index of a scope
+        """
+        scope_index = self._indexes[scope_hash]
+        if faiss is not None:
+            if scope_index['index'] is None:
+                scope_index['index'] = faiss.IndexFlatIP(vectors.shape[1])
+            scope_index['index'].add(vectors)
+        elif scope_index['index'] is None:
+            scope_index['index'] = vectors
+        else:
+            scope_index['index'] = np.vstack([scope_index['index'], vectors])
+
+        scope_index['hashes'].extend(prompt_hashes)
+
+
+class TieredCache:
+    """
+    Layers a process-local LRU and an optional shared Redis tier in front
+    of an LLMCache
+
+    Lookups go memory -> Redis -> LLMCache (SQLite exact, then semantic);
+    a miss computes the response and populates every tier. The Redis tier
+    lets several worker processes share responses.
+    """
+
+    def __init__(self, store: LLMCache, redis_url: Optional[str] = None,
+                 maxsize: int = 1024, ttl: int = 3600):
+        """
+        Initialize the TieredCache
+
+        Args:
+            store: Persistent cache used as the last tier
+            redis_url: Redis connection URL; the Redis tier is disabled when not given
+            maxsize: Maximum number of responses held in memory
+            ttl: Lifetime in seconds of in-memory and Redis entries
+        """
+        self.store = store
+        self.ttl = ttl
+        self.redis_url = redis_url
+        self.stats = store.stats
+        self.stats.update({'memory_hits': 0, 'redis_hits': 0})
+
+        self._memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._redis = None
+        self._redis_loop = None
+
+        if redis_url and aioredis is None:
+            logger.warning('REDIS_URL is set but the redis package is not installed; '
+                           'shared cache tier disabled')
+            self.redis_url = None
+
+    async def get_or_compute(self, prompt: str, compute: Callable[[], Awaitable[str]],
+                             params: Optional[Dict[str, Any]] = None,
+                             scope: Optional[str] = None) -> str:
+        """
+        Return the cached response for prompt from the fastest tier holding
+        it, or compute it and populate every tier
+
+        Args:
+            prompt: Prompt sent to the model
+            compute: Coroutine function producing the response text
+            params: Request parameters that affect the response
+            scope: Scope for semantic matches in the persistent store
+
+        Returns:
+            Response text
+        """
+        key = self.store.key(prompt, params)
+        response = self._memory.get(key)
+        if response is not None:
+            self.stats['memory_hits'] += 1
+            return response
+
+        response = await self._redis_get(key)
+        if response is not None:
+            self.stats['redis_hits'] += 1
+            self._memory[key] = response
+            return response
+
+        response = await self.store.get_or_compute(prompt, compute, params=params, scope=scope)
+        self._memory[key] = response
+        await self._redis_set(key, response)
+        return response
+
+    def get(self, prompt: str, params: Optional[Dict[str, Any]] = None,
+            scope: Optional[str] = None) -> Optional[str]:
+        """
+        Synchronous lookup in the memory and persistent tiers
+        """
+        key = self.store.key(prompt, params)
+        response = self._memory.get(key)
+        if response is not None:
+            self.stats['memory_hits'] += 1
+            return response
+
+        response = self.store.get(prompt, params, scope)
+        if response is not None:
+            self._memory[key] = response
+        return response
+
+    def put(self, prompt: str, response: str, params: Optional[Dict[str, Any]] = None,
+            scope: Optional[str] = None):
+        """
+        Synchronously store a response in the memory and persistent tiers
+        """
+        self._memory[self.store.key(prompt, params)] = response
+        self.store.put(prompt, response, params, scope)
+
+    def close(self):
+        """
+        Close the persistent store
+        """
+        self.store.close()
+
+    async def aclose(self):
+        """
+        Close the Redis client and the persistent store
+        """
+        redis_client, self._redis, self._redis_loop = self._redis, None, None
+        await self._close_redis(redis_client)
+        self.close()
+
+    async def _redis_client(self):
+        """
+        Return a Redis client bound to the running event loop
+
+        A client left over from an earlier event loop is closed and replaced.
+        """
+        loop = asyncio.get_running_loop()
+        if self._redis is None or self._redis_loop is not loop:
+            stale = self._redis
+            self._redis = aioredis.Redis.from_url(self.redis_url)
+            self._redis_loop = loop
+            await self._close_redis(stale)
+        return self._redis
+
+    async def _close_redis(self, redis_client):
+        """
+        Close a Redis client and its connection pool
+        """
+        if redis_client is None:
+            return
+        try:
+            await redis_client.aclose()
+        except Exception as e:
+            logger.warning(f'Failed to close Redis client: {str(e)}')
+
+    def _redis_key(self, key: str) -> str:
+        """
+        Namespaced Redis key for a cache key
+        """
+        return f'llm_cache:{self.store.model_name}:{key}'
+
+    async def _redis_get(self, key: str) -> Optional[str]:
+        """
+        Fetch a response from Redis, treating errors as a miss
+        """
+        if not self.redis_url:
+            return None
+        try:
+            redis_client = await self._redis_client()
+            value = await redis_client.get(self._redis_key(key))
+        except Exception as e:
+            logger.warning(f'Redis cache lookup failed: {str(e)}')
+            return None
+        return value.decode('utf-8') if value is not None else None
+
+    async def _redis_set(self, key: str, response: str):
+        """
+        Store a response in Redis with the tier TTL
+        """
+        if not self.redis_url:
+            return
+        try:
+            redis_client = await self._redis_client()
+            await redis_client.setex(self._redis_key(key), self.ttl, response)
+        except Exception as e:
+            logger.warning(f'Redis cache write failed: {str(e)}')
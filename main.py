@@ -10,7 +10,15 @@ Version: 1.0.0
 
 import os
 import sys
+import argparse
+import atexit
+import asyncio
 import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, List
+import aiofiles
+import orjson
 from dotenv import load_dotenv
 from data_scraper import DataScraper
 from data_analyzer import DataAnalyzer
@@ -19,15 +27,21 @@ from report_generator import ReportGenerator
 # Load environment variables
 load_dotenv()
 
-# Configure logging
+# Configure logging; records are written by a background listener thread
+# so file and console I/O never block the event loop
+log_queue = queue.Queue(-1)
+log_listener = QueueListener(
+    log_queue,
+    logging.FileHandler('ai_agent.log'),
+    logging.StreamHandler()
+)
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('ai_agent.log'),
-        logging.StreamHandler()
-    ]
+    handlers=[QueueHandler(log_queue)]
 )
+log_listener.start()
+atexit.register(log_listener.stop)
 logger = logging.getLogger(__name__)
 
 
@@ -40,7 +54,145 @@ def validate_api_key():
     return api_key
 
 
-def main():
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(
+        description='Research companies or people and generate Markdown reports with Gemini'
+    )
+    parser.add_argument('--query', help='Company or person name to research')
+    parser.add_argument('--queries-file',
+                        help='File with one query per line (plain text or JSON objects with a "query" key)')
+    parser.add_argument('--concurrency', type=int, default=4,
+                        help='Maximum number of queries processed at once (default: 4)')
+    parser.add_argument('--batch', action='store_true',
+                        help='Submit all analyses as one Gemini Batch API job')
+    return parser.parse_args(argv)
+
+
+def load_queries(path: str) -> List[str]:
+    """Read queries from a plain text or JSONL file"""
+    queries = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            query = orjson.loads(line)['query'] if line.startswith('{') else line
+            if query.strip():
+                queries.append(query.strip())
+    return queries
+
+
+def report_filename_for(search_query: str) -> str:
+    """File the report for a query is saved to"""
+    return f"report_{search_query.replace(' ', '_').lower()}.md"
+
+
+async def run_pipeline(search_query: str, scraper: DataScraper, analyzer: DataAnalyzer,
+                       generator: ReportGenerator, report_filename: str,
+                       show_progress: bool = True) -> str:
+    """
+    Run scrape -> analyze -> report as one overlapping async pipeline
+    
+    Each analysis starts as soon as the sources it needs are collected,
+    and each report section is written to report_filename as soon as its
+    analysis finishes.
+    
+    Returns:
+        Formatted Markdown report as string
+    """
+    progress = print if show_progress else (lambda *args: None)
+
+    # Step 1: Scrape data (analyses start while sources are still arriving)
+    progress('\n[Step 1/2] Collecting data from multiple sources...')
+    insights, pending = await analyzer.analyze_stream(search_query, scraper.scrape_iter(search_query))
+    logger.info(f'Data collected for {search_query}: {insights["sources_analyzed"]} sources')
+    progress(f'  ✓ Collected data from {insights["sources_analyzed"]} sources')
+
+    try:
+        # Step 2: Analyze data, building each report section as its analysis completes
+        progress('\n[Step 2/2] Analyzing data with Gemini AI and generating report...')
+        async with aiofiles.open(report_filename, 'w', encoding='utf-8') as f:
+            report = await generator.generate_stream(
+                search_query, insights, analyzer.iter_completed(pending), f
+            )
+        logger.info(f'Data analysis completed and report generated for {search_query}')
+        progress('  ✓ Analysis completed')
+        progress('  ✓ Report generated')
+        return report
+
+    finally:
+        for task in pending.values():
+            task.cancel()
+
+
+async def run_single(search_query: str, api_key: str) -> str:
+    """Research one query, returning its report"""
+    logger.info('Initializing DataScraper, DataAnalyzer and ReportGenerator')
+    analyzer = DataAnalyzer(api_key=api_key, redis_url=os.getenv('REDIS_URL'))
+    generator = ReportGenerator()
+
+    async with DataScraper(api_key=api_key) as scraper, analyzer:
+        return await run_pipeline(
+            search_query, scraper, analyzer, generator, report_filename_for(search_query)
+        )
+
+
+async def run_many(queries: List[str], api_key: str, concurrency: int, batch: bool = False) -> int:
+    """
+    Research many queries sharing one scraper, analyzer and report generator
+    
+    At most `concurrency` queries are in flight at once. With batch=True all
+    scraping happens first and the analyses go out as one Gemini batch job.
+    
+    Returns:
+        Number of queries whose analysis succeeded; in batch mode a failed
+        analysis still gets a report describing the error
+    """
+    logger.info('Initializing DataScraper, DataAnalyzer and ReportGenerator')
+    analyzer = DataAnalyzer(api_key=api_key, redis_url=os.getenv('REDIS_URL'))
+    generator = ReportGenerator()
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async with DataScraper(api_key=api_key) as scraper, analyzer:
+        if batch:
+            async def scrape_one(search_query: str) -> Dict[str, Any]:
+                async with semaphore:
+                    return await scraper.scrape_async(search_query)
+
+            datasets = await asyncio.gather(*(scrape_one(q) for q in queries))
+            all_insights = await asyncio.to_thread(analyzer.analyze_many, list(datasets))
+
+            completed = 0
+            for search_query, insights in zip(queries, all_insights):
+                report_filename = report_filename_for(search_query)
+                async with aiofiles.open(report_filename, 'w', encoding='utf-8') as f:
+                    await f.write(generator.generate(search_query, insights))
+                if 'error' in insights:
+                    print(f'  ✗ {search_query}: {insights["error"]}')
+                    continue
+                print(f'  ✓ {search_query} -> {report_filename}')
+                completed += 1
+            return completed
+
+        async def research_one(search_query: str) -> bool:
+            async with semaphore:
+                report_filename = report_filename_for(search_query)
+                try:
+                    await run_pipeline(search_query, scraper, analyzer, generator,
+                                       report_filename, show_progress=False)
+                except Exception as e:
+                    logger.error(f'Research on {search_query} failed: {str(e)}')
+                    print(f'  ✗ {search_query}: {str(e)}')
+                    return False
+                print(f'  ✓ {search_query} -> {report_filename}')
+                return True
+
+        results = await asyncio.gather(*(research_one(q) for q in queries))
+        return sum(results)
+
+
+def main(argv: List[str] = None):
     """
     Main function to orchestrate the AI agent workflow
     
@@ -49,51 +201,68 @@ def main():
     2. Analyze data using Gemini AI
     3. Generate structured markdown report
     4. Save report to file
+    
+    Queries come from --query/--queries-file, or interactively when
+    neither is given.
     """
+    args = parse_args(argv)
+
     try:
         # Validate prerequisites
         api_key = validate_api_key()
         logger.info('API key validated successfully')
         
-        # Get input from user
         print('\n' + '='*60)
         print('AI DATA SCIENTIST AGENT - v1.0.0')
         print('='*60)
         
-        search_query = input('\n[INPUT] Enter company or person name to research: ').strip()
+        queries = []
+        if args.query:
+            queries.append(args.query.strip())
+        if args.queries_file:
+            queries.extend(load_queries(args.queries_file))
+
+        # Get input from user
+        if not args.query and not args.queries_file:
+            queries.append(input('\n[INPUT] Enter company or person name to research: ').strip())
 
-        if not search_query:
+        queries = [q for q in queries if q]
+        if not queries:
             logger.warning('Empty search query provided')
             print('Error: Please provide a valid search query')
             sys.exit(1)
 
+        # Queries sharing a report file would overwrite each other; keep the first
+        queries_by_report = {}
+        for search_query in queries:
+            report_filename = report_filename_for(search_query)
+            if report_filename in queries_by_report:
+                logger.warning(f'Skipping duplicate query {search_query}: '
+                               f'{report_filename} is the report file of {queries_by_report[report_filename]}')
+                print(f'  - Skipping {search_query}: same report file as {queries_by_report[report_filename]}')
+                continue
+            queries_by_report[report_filename] = search_query
+        queries = list(queries_by_report.values())
+
+        if len(queries) > 1 or args.batch:
+            logger.info(f'Starting research on {len(queries)} queries')
+            print(f'\n[PROCESS] Starting research on {len(queries)} queries')
+            print('='*60 + '\n')
+
+            completed = asyncio.run(run_many(queries, api_key, args.concurrency, batch=args.batch))
+
+            print('\n' + '='*60)
+            print(f'RESEARCH COMPLETE: {completed}/{len(queries)} succeeded')
+            print('='*60 + '\n')
+            return 0 if completed == len(queries) else 1
+
+        search_query = queries[0]
         logger.info(f'Starting research on: {search_query}')
         print(f'\n[PROCESS] Starting research on: {search_query}')
         print('='*60)
 
-        # Step 1: Scrape data
-        print('\n[Step 1/3] Collecting data from multiple sources...')
-        logger.info('Initializing DataScraper')
-        scraper = DataScraper(api_key=api_key)
-        data = scraper.scrape(search_query)
-        logger.info(f'Data collected: {len(data.get("sources", []))} sources')
-        print(f'  ✓ Collected data from {len(data.get("sources", []))} sources')
-
-        # Step 2: Analyze data
-        print('\n[Step 2/3] Analyzing data with Gemini AI...')
-        logger.info('Initializing DataAnalyzer')
-        analyzer = DataAnalyzer(api_key=api_key)
-        insights = analyzer.analyze(data)
-        logger.info('Data analysis completed')
-        print('  ✓ Analysis completed')
-
-        # Step 3: Generate report
-        print('\n[Step 3/3] Generating structured report...')
-        logger.info('Initializing ReportGenerator')
-        generator = ReportGenerator()
-        report = generator.generate(search_query, insights)
-        logger.info('Report generated')
-        print('  ✓ Report generated')
+        report_filename = report_filename_for(search_query)
+        report = asyncio.run(run_single(search_query, api_key))
 
         # Display results
         print('\n' + '='*60)
@@ -101,11 +270,6 @@ def main():
         print('='*60)
         print(f'\n{report}')
 
-        # Save report
-        report_filename = f"report_{search_query.replace(' ', '_').lower()}.md"
-        with open(report_filename, 'w', encoding='utf-8') as f:
-            f.write(report)
-        
         logger.info(f'Report saved to: {report_filename}')
         print(f'\n[OUTPUT] Report saved to: {report_filename}')
         print('='*60 + '\n')
@@ -7,10 +7,26 @@ Generates professional Markdown reports from analyzed data
 
 import logging
 from datetime import datetime
-from typing import Dict, Any
+from string import Template
+from typing import Dict, Any, AsyncIterable, Callable, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+HEADER_TEMPLATE = Template("""# Research Report: $query
+
+**Generated:** $timestamp
+**Sources Analyzed:** $sources
+**Report Version:** $version
+
+---\n\n""")
+
+FOOTER_TEMPLATE = Template("""---
+
+*Report generated by AI Data Scientist Agent v$version*
+*Using Google Gemini API for intelligent analysis*
+*For more information, visit: https://github.com/Angelsk2207/ai-data-scientist-agent*
+""")
+
 
 class ReportGenerator:
     """
@@ -24,13 +40,14 @@ class ReportGenerator:
         self.template_version = '1.0'
         logger.info('ReportGenerator initialized')
     
-    def generate(self, query: str, insights: Dict[str, Any]) -> str:
+    def generate(self, query: str, insights: Dict[str, Any], timestamp: Optional[str] = None) -> str:
         """
         Generate a comprehensive Markdown report
         
         Args:
             query: Search query (company or person name)
             insights: Dictionary with analysis results from DataAnalyzer
+            timestamp: Generation time to print; defaults to the insights timestamp
             
         Returns:
             Formatted Markdown report as string
@@ -38,55 +55,116 @@ class ReportGenerator:
         logger.info(f'Generating report for: {query}')
         
         try:
-            report = self._build_header(query, insights)
-            report += self._build_executive_summary(insights)
-            report += self._build_financial_section(insights)
-            report += self._build_history_section(insights)
-            report += self._build_industry_section(insights)
-            report += self._build_swot_section(insights)
-            report += self._build_predictions_section(insights)
-            report += self._build_footer()
+            parts = [
+                self._build_header(query, insights, timestamp),
+                self._build_executive_summary(insights)
+            ]
+            parts.extend(build_section(insights) for _, build_section in self._section_builders())
+            parts.append(self._build_footer())
             
             logger.info('Report generated successfully')
-            return report
+            return ''.join(parts)
+        
+        except Exception as e:
+            logger.error(f'Error generating report: {str(e)}')
+            return self._error_report(query, str(e), timestamp)
+    
+    async def generate_stream(self, query: str, insights: Dict[str, Any],
+                              sections: AsyncIterable[Tuple[str, Any]], out: Any,
+                              timestamp: Optional[str] = None) -> str:
+        """
+        Generate the report incrementally, writing each section to out as
+        soon as its analysis arrives
+        
+        Sections appear in the order their analyses complete. Results are
+        stored into insights['analysis'].
+        
+        Args:
+            query: Search query (company or person name)
+            insights: Insights metadata from DataAnalyzer.analyze_stream
+            sections: Async iterable of (section, analysis result) tuples,
+                e.g. DataAnalyzer.iter_completed
+            out: Async text file receiving the report, e.g. from aiofiles.open
+            timestamp: Generation time to print; defaults to the insights timestamp
+            
+        Returns:
+            Formatted Markdown report as string
+        """
+        logger.info(f'Generating report for: {query}')
+        
+        builders = dict(self._section_builders())
+        parts = []
+        
+        async def emit(text: str):
+            if text:
+                parts.append(text)
+                await out.write(text)
+                await out.flush()
+        
+        try:
+            await emit(self._build_header(query, insights, timestamp))
+            await emit(self._build_executive_summary(insights))
+            
+            async for section, result in sections:
+                if not result or section not in builders:
+                    continue
+                insights.setdefault('analysis', {})[section] = result
+                await emit(builders[section](insights))
+            
+            await emit(self._build_footer())
+            
+            logger.info('Report generated successfully')
+            return ''.join(parts)
         
         except Exception as e:
             logger.error(f'Error generating report: {str(e)}')
-            return self._error_report(query, str(e))
+            report = self._error_report(query, str(e), timestamp)
+            await out.seek(0)
+            await out.truncate()
+            await out.write(report)
+            return report
+    
+    def _section_builders(self) -> List[Tuple[str, Callable[[Dict], str]]]:
+        """
+        Analysis sections paired with their builders, in report order
+        """
+        return [
+            ('financial', self._build_financial_section),
+            ('history', self._build_history_section),
+            ('industry', self._build_industry_section),
+            ('swot', self._build_swot_section),
+            ('predictions', self._build_predictions_section)
+        ]
     
-    def _build_header(self, query: str, insights: Dict) -> str:
+    def _build_header(self, query: str, insights: Dict, timestamp: Optional[str] = None) -> str:
         """
         Build the report header
         """
-        timestamp = insights.get('timestamp', datetime.now().isoformat())
+        timestamp = timestamp or insights.get('timestamp') or datetime.now().isoformat()
         sources = insights.get('sources_analyzed', 0)
         
-        header = f"""# Research Report: {query}
-
-**Generated:** {timestamp}
-**Sources Analyzed:** {sources}
-**Report Version:** {self.template_version}
-
----\n\n"""
-        return header
+        return HEADER_TEMPLATE.substitute(
+            query=query, timestamp=timestamp, sources=sources, version=self.template_version
+        )
     
     def _build_executive_summary(self, insights: Dict) -> str:
         """
         Build executive summary section
         """
-        summary = "## Executive Summary\n\n"
+        summary = ["## Executive Summary\n\n"]
         
         if 'error' in insights:
-            summary += f"*Note: Analysis encountered an issue: {insights.get('error')}*\n\n"
+            summary.append(f"*Note: Analysis encountered an issue: {insights.get('error')}*\n\n")
         else:
-            analysis = insights.get('analysis', {})
             sources = insights.get('sources_analyzed', 0)
             
-            summary += f"This report provides a comprehensive analysis of the subject based on {sources} sources. "
-            summary += "The analysis includes financial metrics, historical background, industry positioning, "
-            summary += "SWOT analysis, and future predictions.\n\n"
+            summary.append(
+                f"This report provides a comprehensive analysis of the subject based on {sources} sources. "
+                "The analysis includes financial metrics, historical background, industry positioning, "
+                "SWOT analysis, and future predictions.\n\n"
+            )
         
-        return summary
+        return ''.join(summary)
     
     def _build_financial_section(self, insights: Dict) -> str:
         """
@@ -98,16 +176,13 @@ class ReportGenerator:
         if not financial:
             return ""
         
-        section = "## Financial Analysis\n\n"
+        section = ["## Financial Analysis\n\n"]
+        section.extend(
+            f"**{key.replace('_', ' ').title()}:** {value}\n\n"
+            for key, value in financial.items()
+        )
         
-        if isinstance(financial, dict):
-            for key, value in financial.items():
-                if key != 'summary':
-                    section += f"**{key.replace('_', ' ').title()}:** {value}\n\n"
-        else:
-            section += f"{financial}\n\n"
-        
-        return section
+        return ''.join(section)
     
     def _build_history_section(self, insights: Dict) -> str:
         """
@@ -161,22 +236,14 @@ class ReportGenerator:
         if not swot:
             return ""
         
-        section = "## SWOT Analysis\n\n"
-        
-        if isinstance(swot, dict):
-            for category in ['strengths', 'weaknesses', 'opportunities', 'threats']:
-                items = swot.get(category, [])
-                section += f"### {category.capitalize()}\n"
-                if isinstance(items, list):
-                    for item in items:
-                        section += f"- {item}\n"
-                else:
-                    section += f"{items}\n"
-                section += "\n"
-        else:
-            section += f"{swot}\n\n"
+        section = ["## SWOT Analysis\n\n"]
         
-        return section
+        for category in ['strengths', 'weaknesses', 'opportunities', 'threats']:
+            section.append(f"### {category.capitalize()}\n")
+            section.extend(f"- {item}\n" for item in swot.get(category, []))
+            section.append("\n")
+        
+        return ''.join(section)
     
     def _build_predictions_section(self, insights: Dict) -> str:
         """
@@ -203,15 +270,9 @@ class ReportGenerator:
         """
         Build report footer
         """
-        footer = f"""---
-
-*Report generated by AI Data Scientist Agent v{self.template_version}*
-*Using Google Gemini API for intelligent analysis*
-*For more information, visit: https://github.com/Angelsk2207/ai-data-scientist-agent*
-"""
-        return footer
+        return FOOTER_TEMPLATE.substitute(version=self.template_version)
     
-    def _error_report(self, query: str, error: str) -> str:
+    def _error_report(self, query: str, error: str, timestamp: Optional[str] = None) -> str:
         """
         Generate error report
         """
@@ -219,8 +280,9 @@ class ReportGenerator:
 
 **Status:** Analysis Failed
 **Error:** {error}
-**Generated:** {datetime.now().isoformat()}
+**Generated:** {timestamp or datetime.now().isoformat()}
 
 The analysis could not be completed due to the error mentioned above.
 Please try again or contact support.
-"""}
+"""
+
@@ -0,0 +1,91 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from data_analyzer import DataAnalyzer
+from llm_cache import LLMCache, TieredCache
+
+
+class FakeModel:
+    """
+    Stands in for genai.GenerativeModel, streaming canned replies in order
+    """
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.calls = 0
+
+    async def generate_content_async(self, prompt, generation_config=None, stream=False):
+        reply = self.replies[self.calls]
+        self.calls += 1
+
+        async def chunks():
+            yield SimpleNamespace(text=reply)
+
+        return chunks()
+
+
+@pytest.fixture
+def analyzer(tmp_path):
+    analyzer = DataAnalyzer(api_key='test-key', use_cache=False)
+    analyzer.cache = TieredCache(LLMCache(analyzer.model_name, path=str(tmp_path / 'cache.sqlite')))
+    yield analyzer
+    analyzer.cache.close()
+
+
+def test_invalid_section_reply_is_not_cached(analyzer):
+    analyzer.model = FakeModel(['not json', '{"revenue": "1B"}'])
+
+    assert asyncio.run(analyzer._analyze_financial('context', 'Acme')) is None
+    assert asyncio.run(analyzer._analyze_financial('context', 'Acme')) == {'revenue': '1B'}
+    assert analyzer.model.calls == 2
+
+    # The valid reply is cached and served without another call
+    assert asyncio.run(analyzer._analyze_financial('context', 'Acme')) == {'revenue': '1B'}
+    assert analyzer.model.calls == 2
+
+
+def test_non_object_section_reply_is_not_cached(analyzer):
+    analyzer.model = FakeModel(['["strength"]', '{"strengths": ["brand"]}'])
+
+    assert asyncio.run(analyzer._analyze_swot('context', 'Acme')) is None
+    assert asyncio.run(analyzer._analyze_swot('context', 'Acme')) == {'strengths': ['brand']}
+    assert analyzer.model.calls == 2
+
+
+def test_invalid_batch_reply_is_not_cached(analyzer):
+    replies = [{'0:financial': 'not json'}, {'0:financial': '{"revenue": "1B"}'}]
+    analyzer._run_batch_job = lambda prompts: replies.pop(0)
+    requests = {'0:financial': ('Acme', 'financial', 'context')}
+
+    results, error = analyzer._batch_generate(requests, analyzer._section_result)
+    assert results == {} and error is None
+
+    results, error = analyzer._batch_generate(requests, analyzer._section_result)
+    assert results == {'0:financial': {'revenue': '1B'}}
+    assert not replies
+
+
+def test_invalid_combined_reply_is_not_cached(analyzer):
+    analyzer.model = FakeModel(['not json', '{"financial": {}}', '{"history": {"timeline": "1900"}}'])
+
+    assert asyncio.run(analyzer._analyze_all('context', 'Acme')) is None
+    assert asyncio.run(analyzer._analyze_all('context', 'Acme')) is None
+    assert asyncio.run(analyzer._analyze_all('context', 'Acme')) == {'history': {'timeline': '1900'}}
+    assert analyzer.model.calls == 3
+
+    assert asyncio.run(analyzer._analyze_all('context', 'Acme')) == {'history': {'timeline': '1900'}}
+    assert analyzer.model.calls == 3
+
+
+def test_invalid_combined_batch_reply_is_not_cached(analyzer):
+    replies = [{'0:all': '[]'}, {'0:all': '{"history": {"timeline": "1900"}}'}]
+    analyzer._run_batch_job = lambda prompts: replies.pop(0)
+    requests = {'0:all': ('Acme', 'all', 'context')}
+    parse = lambda name, text: analyzer._combined_result(text)
+
+    assert analyzer._batch_generate(requests, parse) == ({}, None)
+    assert analyzer._batch_generate(requests, parse) == ({'0:all': {'history': {'timeline': '1900'}}}, None)
+    assert analyzer._batch_generate(requests, parse) == ({'0:all': {'history': {'timeline': '1900'}}}, None)
+    assert not replies
@@ -0,0 +1,30 @@
+import asyncio
+
+import pytest
+
+from llm_cache import LLMCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = LLMCache('test-model', path=str(tmp_path / 'cache.sqlite'), embed_fn=lambda text: [1.0, 0.0])
+    yield cache
+    cache.close()
+
+
+def test_failed_compute_drops_pending_embedding(cache):
+    async def compute():
+        raise RuntimeError('model unavailable')
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(cache.get_or_compute('prompt', compute, scope='scope'))
+    assert cache._pending_embeddings == {}
+
+
+def test_computed_response_is_stored(cache):
+    async def compute():
+        return 'response'
+
+    assert asyncio.run(cache.get_or_compute('prompt', compute, scope='scope')) == 'response'
+    assert cache._pending_embeddings == {}
+    assert cache.get('prompt', scope='scope') == 'response'